@@ -1,15 +1,19 @@
-import json
+from _fastjson import dumps
+
+# The preflight response never changes, so build it once
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
+    'Access-Control-Max-Age': '86400'
+}
+_CORS_BODY = dumps({'message': 'CORS preflight handled'})
 
 def handler(event, context):
     print("CORS handler invoked for:", event['httpMethod'], event['path'])
-    
+
     return {
         'statusCode': 200,
-        'headers': {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
-            'Access-Control-Max-Age': '86400'
-        },
-        'body': json.dumps({'message': 'CORS preflight handled'})
+        'headers': _CORS_HEADERS,
+        'body': _CORS_BODY
     }
\ No newline at end of file
@@ -1,24 +1,29 @@
-import json
-import boto3
 import os
-import uuid
+from concurrent.futures import ThreadPoolExecutor
+import secrets
 from datetime import datetime, timezone
+from _clients import dynamodb_client
+from _fastjson import dumps, loads
+from _schedules import create_expiry_schedule, delete_expiry_schedule
+from _utils import to_attribute_values
 
-dynamodb = boto3.resource('dynamodb')
 table_name = os.environ.get('TABLE_NAME', 'TodoAppTable')
-table = dynamodb.Table(table_name)
+_UTC = timezone.utc
+
+# Runs the DynamoDB write and the expiry schedule creation side by side
+executor = ThreadPoolExecutor(max_workers=2)
+
+# CORS headers shared by every response
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
+    'Content-Type': 'application/json'
+}
 
 def handler(event, context):
-    # CORS headers - ADD THIS SECTION
-    cors_headers = {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
-        'Content-Type': 'application/json'
-    }
-    
     try:
-        body = json.loads(event['body'])
+        body = loads(event['body'])
         description = body.get('description')
         deadline = body.get('deadline')
 
@@ -27,24 +32,33 @@ def handler(event, context):
         if not description or not deadline:
             return {
                 'statusCode': 400,
-                'headers': cors_headers,  # ADD THIS
-                'body': json.dumps({'message': 'Description and deadline are required.'})
+                'headers': _CORS_HEADERS,
+                'body': dumps({'message': 'Description and deadline are required.'})
+            }
+
+        if not isinstance(description, str):
+            return {
+                'statusCode': 400,
+                'headers': _CORS_HEADERS,
+                'body': dumps({'message': 'Description must be a string.'})
             }
 
         # Validate and format deadline
         try:
-            deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+            deadline_dt = datetime.fromisoformat(deadline)
             if deadline_dt.tzinfo is None:
-                deadline_dt = deadline_dt.replace(tzinfo=timezone.utc)
+                deadline_dt = deadline_dt.replace(tzinfo=_UTC)
+            else:
+                deadline_dt = deadline_dt.astimezone(_UTC)
             formatted_deadline = deadline_dt.isoformat()
         except ValueError:
             return {
                 'statusCode': 400,
-                'headers': cors_headers,  # ADD THIS
-                'body': json.dumps({'message': 'Invalid deadline format. Use ISO format.'})
+                'headers': _CORS_HEADERS,
+                'body': dumps({'message': 'Invalid deadline format. Use ISO format.'})
             }
 
-        task_id = str(uuid.uuid4())
+        task_id = secrets.token_hex(16)
 
         item = {
             'PK': f"USER#{user_id}",
@@ -54,22 +68,46 @@ def handler(event, context):
             'taskId': task_id,
             'userId': user_id,
             'description': description,
-            'date': datetime.now(timezone.utc).isoformat(),
+            'date': datetime.now(_UTC).isoformat(),
             'status': 'Pending',
             'deadline': formatted_deadline
         }
 
-        table.put_item(Item=item)
+        # Write the task and create its expiry schedule concurrently.
+        # Tasks whose deadline has already passed are stored without one.
+        put_future = executor.submit(
+            dynamodb_client.put_item,
+            TableName=table_name,
+            Item=to_attribute_values(item)
+        )
+        if deadline_dt > datetime.now(_UTC):
+            schedule_future = executor.submit(create_expiry_schedule, item, deadline_dt)
+        else:
+            schedule_future = None
+
+        # exception() blocks until each call has finished
+        put_error = put_future.exception()
+        schedule_error = schedule_future.exception() if schedule_future else None
+        if put_error or schedule_error:
+            # Undo whichever half succeeded so no task is left without a schedule
+            if not put_error:
+                dynamodb_client.delete_item(
+                    TableName=table_name,
+                    Key=to_attribute_values({'PK': item['PK'], 'SK': item['SK']})
+                )
+            if schedule_future and not schedule_error:
+                delete_expiry_schedule(task_id)
+            raise put_error or schedule_error
 
         return {
             'statusCode': 201,
-            'headers': cors_headers,  # ADD THIS
-            'body': json.dumps(item)
+            'headers': _CORS_HEADERS,
+            'body': dumps(item)
         }
     except Exception as e:
         print(f"Error creating task: {e}")
         return {
             'statusCode': 500,
-            'headers': cors_headers,  # ADD THIS
-            'body': json.dumps({'message': 'Failed to create task.'})
+            'headers': _CORS_HEADERS,
+            'body': dumps({'message': 'Failed to create task.'})
         }
\ No newline at end of file
@@ -1,42 +1,47 @@
-import json
-import boto3
 import os
-from boto3.dynamodb.conditions import Key
+from _clients import dynamodb_client
+from _fastjson import dumps
 
-dynamodb = boto3.resource('dynamodb')
 table_name = os.environ.get('TABLE_NAME', 'TodoAppTable')
-table = dynamodb.Table(table_name)
+ConditionalCheckFailed = dynamodb_client.exceptions.ConditionalCheckFailedException
+
+# CORS headers shared by every response
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
+    'Content-Type': 'application/json'
+}
 
 def handler(event, context):
-    # CORS headers - ADD THIS SECTION
-    cors_headers = {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
-        'Content-Type': 'application/json'
-    }
-    
     try:
         task_id = event['pathParameters']['taskId']
         user_id = event['requestContext']['authorizer']['claims']['sub']
 
-        table.delete_item(
+        dynamodb_client.delete_item(
+            TableName=table_name,
             Key={
-                'PK': f"USER#{user_id}",
-                'SK': f"TASK#{task_id}"
+                'PK': {'S': f"USER#{user_id}"},
+                'SK': {'S': f"TASK#{task_id}"}
             },
-            ConditionExpression=Key('SK').eq(f"TASK#{task_id}")
+            ConditionExpression='attribute_exists(SK)'
         )
         
         return {
             'statusCode': 204,
-            'headers': cors_headers,  # ADD THIS
+            'headers': _CORS_HEADERS,
             'body': ''
         }
+    except ConditionalCheckFailed:
+        return {
+            'statusCode': 404,
+            'headers': _CORS_HEADERS,
+            'body': dumps({'message': 'Task not found.'})
+        }
     except Exception as e:
         print(e)
         return {
             'statusCode': 500,
-            'headers': cors_headers,  # ADD THIS
-            'body': json.dumps({'message': 'Failed to delete task.'})
+            'headers': _CORS_HEADERS,
+            'body': dumps({'message': 'Failed to delete task.'})
         }
\ No newline at end of file
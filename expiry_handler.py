@@ -1,31 +1,24 @@
 # expiry_handler.py - UPDATED WITH BETTER DATE FORMATTING
-import json
-import boto3
+import logging
 import os
 from boto3.dynamodb.conditions import Key, Attr
-from datetime import datetime, timezone
+from _clients import dynamodb, sns
+from _fastjson import dumps
+from _utils import EXPIRY_MESSAGE_TEMPLATE, format_date_for_email
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-sns = boto3.client('sns')
+# Full event dumps are only serialized when LOG_LEVEL=DEBUG
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 # Environment variables
 TABLE_NAME = os.environ.get('TABLE_NAME')
 SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN')
 table = dynamodb.Table(TABLE_NAME)
-
-def format_date_for_email(iso_date_string):
-    """Convert ISO date string to human-readable format for emails"""
-    try:
-        date_obj = datetime.fromisoformat(iso_date_string.replace('Z', '+00:00'))
-        # Format as: September 29, 2025 at 3:09 PM
-        return date_obj.strftime('%B %d, %Y at %I:%M %p')
-    except:
-        # Fallback to original format if parsing fails
-        return iso_date_string
+ConditionalCheckFailed = dynamodb.meta.client.exceptions.ConditionalCheckFailedException
 
 def handler(event, context):
-    print(f"Expiry Handler invoked for event: {json.dumps(event)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Expiry Handler invoked for event: %s", dumps(event))
     
     # The event payload comes directly from EventBridge target input
     # It should be: {'taskId': 'xxx', 'userId': 'xxx', 'pk': 'xxx', 'sk': 'xxx'}
@@ -60,13 +53,10 @@ def handler(event, context):
         # Format the deadline for human readability
         formatted_deadline = format_date_for_email(task_details.get('deadline', ''))
         
-        message = (
-            f"ALERT: Your To-Do Task has Expired!\n\n"
-            f"Task: {task_details.get('description', 'Untitled Task')}\n"
-            f"Task ID: {task_id}\n"
-            f"Deadline: {formatted_deadline}\n\n"
-            f"This task was due and has been automatically marked as expired. "
-            f"Please log in to the Todo App to review your tasks."
+        message = EXPIRY_MESSAGE_TEMPLATE.format(
+            description=task_details.get('description', 'Untitled Task'),
+            task_id=task_id,
+            deadline=formatted_deadline
         )
         
         sns.publish(
@@ -76,7 +66,7 @@ def handler(event, context):
         )
         print(f"Expiry notification sent for Task {task_id}")
         
-    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+    except ConditionalCheckFailed:
         # This is expected if the user manually marked it 'Completed' or 'Deleted'
         print(f"Task {task_id} status was not 'Pending'. No update performed and no email sent.")
         
@@ -1,43 +1,73 @@
-import json
-import boto3
+import io
+import logging
 import os
+from _clients import dynamodb
+from _fastjson import dumps
+
+# Full event dumps are only serialized when LOG_LEVEL=DEBUG
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+table_name = os.environ.get('TABLE_NAME', 'TodoAppTable')
+
+# Query shape is the same for every user; only the key values change.
+# Attribute names are aliased since 'status' and 'date' are reserved words.
+_KEY_CONDITION = 'PK = :pk AND begins_with(SK, :sk_prefix)'
+_PROJECTION_NAMES = {
+    '#taskId': 'taskId',
+    '#description': 'description',
+    '#status': 'status',
+    '#deadline': 'deadline',
+    '#date': 'date'
+}
+_PROJECTION = ', '.join(_PROJECTION_NAMES)
+
+# CORS headers shared by every response
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
+    'Content-Type': 'application/json'
+}
 
 def handler(event, context):
-    print("Event:", json.dumps(event))
-    
-    # CORS headers
-    cors_headers = {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
-        'Content-Type': 'application/json'
-    }
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Event: %s", dumps(event))
     
     try:
         # Get user ID from Cognito authorizer
         user_id = event['requestContext']['authorizer']['claims']['sub']
         
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(os.environ['TABLE_NAME'])
-        
-        # Query tasks for the specific user
-        response = table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('PK').eq(f"USER#{user_id}") & 
-                                  boto3.dynamodb.conditions.Key('SK').begins_with('TASK#')
+        # Query tasks for the specific user, following every result page
+        pages = dynamodb.meta.client.get_paginator('query').paginate(
+            TableName=table_name,
+            KeyConditionExpression=_KEY_CONDITION,
+            ProjectionExpression=_PROJECTION,
+            ExpressionAttributeNames=_PROJECTION_NAMES,
+            ExpressionAttributeValues={':pk': f"USER#{user_id}", ':sk_prefix': 'TASK#'}
         )
         
-        tasks = response.get('Items', [])
+        # Serialize items as they arrive instead of collecting one big list
+        body = io.StringIO()
+        body.write('[')
+        separator = ''
+        for page in pages:
+            for item in page.get('Items', []):
+                body.write(separator)
+                body.write(dumps(item))
+                separator = ', '
+        body.write(']')
         
         return {
             'statusCode': 200,
-            'headers': cors_headers,
-            'body': json.dumps(tasks)
+            'headers': _CORS_HEADERS,
+            'body': body.getvalue()
         }
         
     except Exception as e:
         print("Error:", str(e))
         return {
             'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({'error': str(e)})
+            'headers': _CORS_HEADERS,
+            'body': dumps({'error': str(e)})
         }
\ No newline at end of file
@@ -0,0 +1,35 @@
+# _clients.py - AWS clients shared by all handlers
+# Every client comes from one boto3 Session and one botocore Config, so
+# credentials are resolved once and connections are kept alive between warm
+# invocations. Clients are built the first time a handler imports them, so a
+# function only pays for the services it actually uses.
+import boto3
+from botocore.config import Config
+
+boto_config = Config(
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 3},
+    max_pool_connections=10
+)
+
+_session = boto3.session.Session()
+
+_FACTORIES = {
+    'dynamodb': lambda: _session.resource('dynamodb', config=boto_config),
+    # Plain client without the resource layer's type (de)serialization
+    'dynamodb_client': lambda: _session.client('dynamodb', config=boto_config),
+    # Only needed to clean up expiry rules created before EventBridge Scheduler
+    'events': lambda: _session.client('events', config=boto_config),
+    'scheduler': lambda: _session.client('scheduler', config=boto_config),
+    'sns': lambda: _session.client('sns', config=boto_config),
+    'sqs': lambda: _session.client('sqs', config=boto_config),
+}
+
+def __getattr__(name):
+    """Builds a client on first access and caches it as a module attribute."""
+    try:
+        factory = _FACTORIES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    client = globals()[name] = factory()
+    return client
@@ -0,0 +1,19 @@
+# _fastjson.py - JSON helpers shared by all handlers
+# Uses orjson when the shared layer provides it and falls back to the
+# standard library otherwise. Values JSON can't represent (e.g. Decimal
+# from DynamoDB) are written as strings by both backends.
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=str).decode()
+
+    loads = orjson.loads
+
+except ImportError:
+    import json
+
+    def dumps(obj):
+        return json.dumps(obj, default=str)
+
+    loads = json.loads
@@ -0,0 +1,75 @@
+# _schedules.py - EventBridge Scheduler helpers for task expiry
+# Used by create_task (new tasks) and process_stream (deadline changes and
+# cancellations) so both name and build schedules the same way.
+import os
+from _clients import scheduler
+from _fastjson import dumps
+
+# Schedule Naming Convention
+RULE_NAME_PREFIX = "TodoAppTaskExpiry"
+EXPIRY_HANDLER_ARN = os.environ.get('EXPIRY_HANDLER_ARN')
+SCHEDULER_ROLE_ARN = os.environ.get('SCHEDULER_ROLE_ARN')
+# One-time schedule expression, evaluated in UTC
+SCHEDULE_EXPRESSION_FORMAT = 'at(%Y-%m-%dT%H:%M:%S)'
+
+ScheduleNotFound = scheduler.exceptions.ResourceNotFoundException
+
+def schedule_name(task_id):
+    return f"{RULE_NAME_PREFIX}-{task_id}"
+
+def create_expiry_schedule(task, deadline_dt):
+    """Creates a one-time schedule that invokes the ExpiryHandlerFunction at deadline_dt (UTC)."""
+    if not EXPIRY_HANDLER_ARN or not SCHEDULER_ROLE_ARN:
+        raise ValueError("EXPIRY_HANDLER_ARN or SCHEDULER_ROLE_ARN not set. Cannot schedule event.")
+
+    schedule_expression = deadline_dt.strftime(SCHEDULE_EXPRESSION_FORMAT)
+
+    # Payload delivered to the ExpiryHandlerFunction
+    input_data = {
+        'taskId': task['taskId'],
+        'userId': task['userId'],
+        'pk': task['PK'],
+        'sk': task['SK']
+    }
+
+    # A single call creates the schedule and its target
+    scheduler.create_schedule(
+        Name=schedule_name(task['taskId']),
+        ScheduleExpression=schedule_expression,
+        FlexibleTimeWindow={'Mode': 'OFF'},
+        ActionAfterCompletion='DELETE',
+        Description=f"Expires task {task['taskId']} for user {task['userId']}.",
+        Target={
+            'Arn': EXPIRY_HANDLER_ARN,
+            'RoleArn': SCHEDULER_ROLE_ARN,
+            'Input': dumps(input_data)
+        }
+    )
+    return schedule_expression
+
+def delete_legacy_rule(events, task_id):
+    """Deletes the EventBridge rule used for expiry before the move to EventBridge Scheduler.
+    Returns False if the task has no such rule.
+
+    The events client is passed in by the caller, which builds it at import
+    time; creating it here could happen concurrently in executor threads."""
+    rule_name = schedule_name(task_id)
+
+    try:
+        # 1. Remove Targets first
+        targets_response = events.list_targets_by_rule(Rule=rule_name)
+        if targets_response['Targets']:
+            events.remove_targets(
+                Rule=rule_name,
+                Ids=[target['Id'] for target in targets_response['Targets']]
+            )
+
+        # 2. Delete Rule
+        events.delete_rule(Name=rule_name)
+    except events.exceptions.ResourceNotFoundException:
+        return False
+    return True
+
+def delete_expiry_schedule(task_id):
+    """Deletes the task's expiry schedule. Raises ScheduleNotFound if there is none."""
+    scheduler.delete_schedule(Name=schedule_name(task_id))
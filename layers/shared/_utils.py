@@ -0,0 +1,40 @@
+# _utils.py - Helpers shared by the handlers
+from datetime import datetime
+from boto3.dynamodb.types import TypeDeserializer
+
+_deserializer = TypeDeserializer()
+
+# Month names indexed by datetime.month (English, independent of locale)
+_MONTHS = ('', 'January', 'February', 'March', 'April', 'May', 'June', 'July',
+           'August', 'September', 'October', 'November', 'December')
+
+EXPIRY_MESSAGE_TEMPLATE = (
+    "ALERT: Your To-Do Task has Expired!\n\n"
+    "Task: {description}\n"
+    "Task ID: {task_id}\n"
+    "Deadline: {deadline}\n\n"
+    "This task was due and has been automatically marked as expired. "
+    "Please log in to the Todo App to review your tasks."
+)
+
+def format_date_for_email(iso_date_string):
+    """Convert ISO date string to human-readable format for emails"""
+    try:
+        date_obj = datetime.fromisoformat(iso_date_string)
+    except ValueError:
+        # Fallback to original format if parsing fails
+        return iso_date_string
+
+    # Format as: September 29, 2025 at 03:09 PM
+    hour = date_obj.hour % 12 or 12
+    meridiem = 'PM' if date_obj.hour >= 12 else 'AM'
+    return (f"{_MONTHS[date_obj.month]} {date_obj.day:02d}, {date_obj.year} "
+            f"at {hour:02d}:{date_obj.minute:02d} {meridiem}")
+
+def to_attribute_values(values):
+    """Marshals a dict of strings into DynamoDB AttributeValues for the low-level client"""
+    return {name: {'S': value} for name, value in values.items()}
+
+def from_attribute_values(item):
+    """Converts a DynamoDB item returned by the low-level client to plain Python values"""
+    return {name: _deserializer.deserialize(value) for name, value in item.items()}
@@ -1,12 +1,31 @@
-import json
-import boto3
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from _clients import sns
+from _fastjson import dumps
+
+# Full event dumps are only serialized when LOG_LEVEL=DEBUG
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
-sns = boto3.client('sns')
 sns_topic_arn = os.environ.get('SNS_TOPIC_ARN')
 
+# Runs the subscribe and welcome publish calls concurrently
+executor = ThreadPoolExecutor(max_workers=2)
+
+# Welcome email to confirm subscription is working
+WELCOME_MESSAGE = """
+        Welcome to the Todo App!
+        
+        You have been successfully subscribed to task notifications.
+        You will receive emails when your tasks expire.
+        
+        Thank you for using our service!
+        """
+
 def handler(event, context):
-    print("PostAuth function triggered with event:", json.dumps(event))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("PostAuth function triggered with event: %s", dumps(event))
     
     # Get user email and user pool ID from the event
     user_email = event['request']['userAttributes']['email']
@@ -14,36 +33,34 @@ def handler(event, context):
     
     print(f"Processing user: {user_email} from pool: {user_pool_id}")
     
+    # Subscribe the user's email and send the welcome email at the same time;
+    # the two SNS calls don't depend on each other
+    subscribe_future = executor.submit(
+        sns.subscribe,
+        TopicArn=sns_topic_arn,
+        Protocol='email',
+        Endpoint=user_email
+    )
+    publish_future = executor.submit(
+        sns.publish,
+        TopicArn=sns_topic_arn,
+        Subject="Welcome to Todo App - Notification Subscription Confirmation",
+        Message=WELCOME_MESSAGE
+    )
+    
+    # Don't fail the authentication process if SNS subscription fails
+    # Log the error but allow the user to continue
     try:
-        # Subscribe the user's email to the SNS topic
-        response = sns.subscribe(
-            TopicArn=sns_topic_arn,
-            Protocol='email',
-            Endpoint=user_email
-        )
+        response = subscribe_future.result()
         print(f"User {user_email} subscribed to SNS topic. Response: {response}")
-        
-        # Send a welcome email to confirm subscription is working
-        welcome_message = f"""
-        Welcome to the Todo App!
-        
-        You have been successfully subscribed to task notifications.
-        You will receive emails when your tasks expire.
-        
-        Thank you for using our service!
-        """
-        
-        sns.publish(
-            TopicArn=sns_topic_arn,
-            Subject="Welcome to Todo App - Notification Subscription Confirmation",
-            Message=welcome_message
-        )
+    except Exception as e:
+        print(f"Error subscribing user in PostAuth function: {e}")
+    
+    try:
+        publish_future.result()
         print(f"Welcome email sent to {user_email}")
-
     except Exception as e:
-        print(f"Error in PostAuth function: {e}")
-        # Don't fail the authentication process if SNS subscription fails
-        # Log the error but allow the user to continue
+        print(f"Error sending welcome email in PostAuth function: {e}")
     
     # Return the event to allow the authentication to proceed
     return event
\ No newline at end of file
@@ -1,22 +1,28 @@
 # process_stream.py - UPDATED VERSION
-import json
-import boto3
+import logging
 import os
+from boto3.dynamodb.conditions import Attr
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from _clients import dynamodb, events, sns
+from _fastjson import dumps, loads
+from _schedules import (ScheduleNotFound, create_expiry_schedule, delete_expiry_schedule,
+                        delete_legacy_rule, schedule_name)
+from _utils import EXPIRY_MESSAGE_TEMPLATE, format_date_for_email
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-events = boto3.client('events')
-sns = boto3.client('sns')
+# Full event dumps are only serialized when LOG_LEVEL=DEBUG
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 # Environment variables
 TABLE_NAME = os.environ.get('TABLE_NAME', 'TodoAppTable')
 SQS_QUEUE_URL = os.environ.get('SQS_QUEUE_URL')
+SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN')
 table = dynamodb.Table(TABLE_NAME)
+ConditionalCheckFailed = dynamodb.meta.client.exceptions.ConditionalCheckFailedException
 
-# Rule Naming Convention
-RULE_NAME_PREFIX = "TodoAppTaskExpiry"
-EXPIRY_HANDLER_ARN = os.environ.get('EXPIRY_HANDLER_ARN')
+# Reused across invocations to create and delete schedules concurrently
+schedule_executor = ThreadPoolExecutor(max_workers=10)
 
 def get_task_details(dynamodb_item):
     """Converts a DynamoDB item dictionary to a standard Python dictionary."""
@@ -32,14 +38,10 @@ def get_task_details(dynamodb_item):
     # Filter out None values
     return {k: v for k, v in task.items() if v is not None}
 
-def schedule_expiry_event(task, context):
-    """Schedules an EventBridge rule to expire a PENDING task at its deadline."""
+def schedule_expiry_event(task):
+    """Creates a one-time EventBridge Scheduler schedule to expire a PENDING task at its deadline."""
     
-    if not EXPIRY_HANDLER_ARN:
-        print("EXPIRY_HANDLER_ARN not set. Cannot schedule event.")
-        return
-
-    # 1. Calculate the run time for EventBridge
+    # 1. Calculate the run time for the schedule
     deadline_dt = datetime.fromisoformat(task['deadline']).astimezone(timezone.utc)
     
     # Check if the deadline is in the future
@@ -47,123 +49,74 @@ def schedule_expiry_event(task, context):
         print(f"Task {task['taskId']} deadline is in the past. Skipping schedule.")
         return
 
-    # Use proper cron expression for EventBridge
-    cron_expression = f"cron({deadline_dt.minute} {deadline_dt.hour} {deadline_dt.day} {deadline_dt.month} ? {deadline_dt.year})"
-    rule_name = f"{RULE_NAME_PREFIX}-{task['taskId']}"
-
-    # 2. Define the Target (ExpiryHandlerFunction)
-    input_data = {
-        'taskId': task['taskId'],
-        'userId': task['userId'],
-        'pk': task['PK'],
-        'sk': task['SK']
-    }
-    
+    # 2. Create the schedule targeting the ExpiryHandlerFunction
     try:
-        # Put Rule
-        events.put_rule(
-            Name=rule_name,
-            ScheduleExpression=cron_expression,
-            State='ENABLED',
-            Description=f"Expires task {task['taskId']} for user {task['userId']}."
-        )
-
-        # Put Target (Link the rule to ExpiryHandlerFunction)
-        events.put_targets(
-            Rule=rule_name,
-            Targets=[
-                {
-                    'Id': 'ExpiryLambdaTarget',
-                    'Arn': EXPIRY_HANDLER_ARN,
-                    'Input': json.dumps(input_data)
-                }
-            ]
-        )
-        print(f"Successfully scheduled expiry for Task {task['taskId']} at {cron_expression}")
+        schedule_expression = create_expiry_schedule(task, deadline_dt)
+        print(f"Successfully scheduled expiry for Task {task['taskId']} at {schedule_expression}")
         
     except Exception as e:
         print(f"Error scheduling event for task {task['taskId']}: {e}")
 
 def cancel_expiry_event(task_id):
-    """Cancels the scheduled EventBridge rule."""
-    rule_name = f"{RULE_NAME_PREFIX}-{task_id}"
-    
+    """Deletes the task's expiry schedule and any expiry rule left from before EventBridge Scheduler."""
     try:
-        # 1. Remove Targets first
-        targets_response = events.list_targets_by_rule(Rule=rule_name)
-        if targets_response['Targets']:
-            events.remove_targets(
-                Rule=rule_name,
-                Ids=[target['Id'] for target in targets_response['Targets']]
-            )
-        
-        # 2. Delete Rule
-        events.delete_rule(Name=rule_name)
+        delete_expiry_schedule(task_id)
         print(f"Successfully cancelled expiry event for Task {task_id}")
         
-    except events.exceptions.ResourceNotFoundException:
-        print(f"Rule {rule_name} not found (may have already been deleted)")
+    except ScheduleNotFound:
+        print(f"Schedule {schedule_name(task_id)} not found (may have already run or been deleted)")
     except Exception as e:
-        # Log and ignore error if the rule doesn't exist
-        if 'ResourceNotFoundException' not in str(e):
-            print(f"Error cancelling event for task {task_id}: {e}")
+        print(f"Error cancelling event for task {task_id}: {e}")
+
+    # Best effort: tasks created before the migration still have an EventBridge rule
+    try:
+        if delete_legacy_rule(events, task_id):
+            print(f"Deleted legacy expiry rule for Task {task_id}")
+        
+    except Exception as e:
+        print(f"Error deleting legacy expiry rule for task {task_id}: {e}")
 
 def expire_and_notify_task(task_id, user_id, pk, sk):
     """Handles the actual expiry logic: updates DynamoDB and sends SNS notification."""
     
-    def format_date_for_email(iso_date_string):
-        """Convert ISO date string to human-readable format for emails"""
-        try:
-            date_obj = datetime.fromisoformat(iso_date_string.replace('Z', '+00:00'))
-            return date_obj.strftime('%B %d, %Y at %I:%M %p')
-        except:
-            return iso_date_string
-    
     try:
-        # 1. Check current status
-        response = table.get_item(Key={'PK': pk, 'SK': sk})
-        task = response.get('Item')
-
-        if not task or task['status'] != 'Pending':
-            print(f"Task {task_id} either not found or already processed (Status: {task.get('status', 'N/A')}).")
-            return
-
-        # 2. Update status to 'Expired' in DynamoDB
-        table.update_item(
+        # 1. Update status to 'Expired' only if the task is still Pending
+        response = table.update_item(
             Key={'PK': pk, 'SK': sk},
             UpdateExpression="SET #s = :expired, GSI1PK = :expired",
+            ConditionExpression=Attr('status').eq('Pending'),
             ExpressionAttributeNames={'#s': 'status'},
-            ExpressionAttributeValues={':expired': 'Expired'}
+            ExpressionAttributeValues={':expired': 'Expired'},
+            ReturnValues="ALL_NEW"
         )
+        task = response['Attributes']
         print(f"Task {task_id} status updated to Expired.")
         
-        # 3. Send SNS Notification
-        sns_arn = os.environ['SNS_TOPIC_ARN']
-        
+        # 2. Send SNS Notification
         # Format the deadline for human readability
         formatted_deadline = format_date_for_email(task.get('deadline', ''))
         
-        message = (
-            f"ALERT: Your To-Do Task has Expired!\n\n"
-            f"Task: {task.get('description', 'Untitled Task')}\n"
-            f"Task ID: {task_id}\n"
-            f"Deadline: {formatted_deadline}\n\n"
-            f"This task was due and has been automatically marked as expired. "
-            f"Please log in to the Todo App to review your tasks."
+        message = EXPIRY_MESSAGE_TEMPLATE.format(
+            description=task.get('description', 'Untitled Task'),
+            task_id=task_id,
+            deadline=formatted_deadline
         )
         
         sns.publish(
-            TopicArn=sns_arn,
-            Subject=f"Task Expired: {task['description']}",
+            TopicArn=SNS_TOPIC_ARN,
+            Subject=f"Task Expired: {task.get('description', 'Untitled Task')}",
             Message=message
         )
         print(f"Expiry notification sent for Task {task_id}.")
 
+    except ConditionalCheckFailed:
+        print(f"Task {task_id} either not found or already processed. No update performed.")
     except Exception as e:
         print(f"Error during task expiry process for {task_id}: {e}")
 
 def handler(event, context):
-    print(f"Raw event received: {json.dumps(event)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Raw event received: %s", dumps(event))
     
     # ----------------------------------------------------------------------
     # 1. Check if the invocation is from EventBridge (Task Expiry Trigger)
@@ -180,7 +133,8 @@ def handler(event, context):
             # Input data is the entire event (direct JSON input)
             task_data = event
         
-        print(f"Task data extracted: {json.dumps(task_data)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Task data extracted: %s", dumps(task_data))
         
         # Safely extract task data with defaults
         task_id = task_data.get('taskId')
@@ -200,18 +154,19 @@ def handler(event, context):
     # ----------------------------------------------------------------------
     print(f"Invoked by SQS with {len(event['Records'])} records from DynamoDB Stream.")
     
+    # Schedule changes are collected per task and applied together after the loop
+    pending_cancels = set()
+    pending_schedules = {}
+    
     for record in event['Records']:
         try:
             # SQS Record contains the DynamoDB Stream event as a string in the 'body'
-            ddb_event = json.loads(record['body'])
+            ddb_event = loads(record['body'])
             event_name = ddb_event.get('eventName')
             
             # Extract item details based on event type
-            if event_name == 'INSERT':
-                new_image = ddb_event['dynamodb'].get('NewImage')
-                task = get_task_details(new_image)
-                old_task = None
-            elif event_name == 'MODIFY':
+            # INSERTs need no work here: create_task schedules new tasks itself
+            if event_name == 'MODIFY':
                 new_image = ddb_event['dynamodb'].get('NewImage')
                 old_image = ddb_event['dynamodb'].get('OldImage')
                 task = get_task_details(new_image)
@@ -229,12 +184,8 @@ def handler(event, context):
                 
             task_id = task['taskId']
             
-            # --- Logic for INSERT/MODIFY/REMOVE Events ---
-            if event_name == 'INSERT' and task['status'] == 'Pending':
-                # New task: schedule the expiry event
-                schedule_expiry_event(task, context)
-                
-            elif event_name == 'MODIFY':
+            # --- Logic for MODIFY/REMOVE Events ---
+            if event_name == 'MODIFY':
                 # Get new status from the updated task
                 new_status = task.get('status')
                 old_status = old_task.get('status') if old_task else None
@@ -242,7 +193,8 @@ def handler(event, context):
                 # Check for status change to 'Completed' or 'Expired'
                 if old_status == 'Pending' and new_status in ['Completed', 'Expired']:
                     # Task completed/expired: cancel the scheduled event
-                    cancel_expiry_event(task_id)
+                    pending_schedules.pop(task_id, None)
+                    pending_cancels.add(task_id)
                     
                 # NEW LOGIC: Check if deadline changed while status remains Pending
                 elif new_status == 'Pending' and old_status == 'Pending':
@@ -252,16 +204,22 @@ def handler(event, context):
                     if old_deadline and new_deadline and old_deadline != new_deadline:
                         print(f"Deadline changed for task {task_id}. Rescheduling expiry event.")
                         # Cancel existing event and schedule new one with updated deadline
-                        cancel_expiry_event(task_id)
-                        schedule_expiry_event(task, context)
+                        pending_cancels.add(task_id)
+                        pending_schedules[task_id] = task
                         
             elif event_name == 'REMOVE':
                 # Task was deleted: cancel the scheduled event
-                cancel_expiry_event(task_id)
+                pending_schedules.pop(task_id, None)
+                pending_cancels.add(task_id)
                 
         except Exception as e:
             print(f"Error processing SQS record: {e}")
             # IMPORTANT: Re-raise the exception to trigger SQS FIFO retry
             raise
     
+    # Delete old schedules first so rescheduled tasks don't collide, then
+    # create the new ones; each step runs in parallel across the batch
+    list(schedule_executor.map(cancel_expiry_event, pending_cancels))
+    list(schedule_executor.map(schedule_expiry_event, pending_schedules.values()))
+    
     return {'statusCode': 200, 'body': 'Stream processing complete.'}
\ No newline at end of file
@@ -1,10 +1,32 @@
-import json
-import boto3
 import os
+from _clients import sqs
+from _fastjson import dumps
 
-# Initialize SQS client
-sqs = boto3.client('sqs')
 SQS_QUEUE_URL = os.environ.get('SQS_QUEUE_URL')
+SQS_BATCH_SIZE = 10
+
+# Attributes whose changes process_stream acts on
+WATCHED_ATTRIBUTES = ('status', 'deadline')
+
+def needs_processing(record):
+    """Returns True if process_stream has work to do for this stream record."""
+    ddb = record.get('dynamodb', {})
+    
+    # Only task items carry expiry schedules
+    if not ddb.get('Keys', {}).get('SK', {}).get('S', '').startswith('TASK#'):
+        return False
+    
+    event_name = record.get('eventName')
+    if event_name == 'REMOVE':
+        return True
+    
+    # create_task schedules new tasks itself, so only relevant edits matter
+    if event_name == 'MODIFY':
+        new_image = ddb.get('NewImage', {})
+        old_image = ddb.get('OldImage', {})
+        return any(new_image.get(name) != old_image.get(name) for name in WATCHED_ATTRIBUTES)
+    
+    return False
 
 def handler(event, context):
     """
@@ -18,8 +40,12 @@ def handler(event, context):
     
     # Process each DynamoDB record in the batch
     for record in event['Records']:
+        # Drop records process_stream would ignore before paying for SQS
+        if not needs_processing(record):
+            continue
+        
         # The entire DDB stream record is the payload for SQS
-        message_body = json.dumps(record)
+        message_body = dumps(record)
         
         # Use the eventID as the MessageDeduplicationId and MessageGroupId for SQS FIFO
         # The eventID is guaranteed to be unique within the stream for a specific update.
@@ -36,17 +62,19 @@ def handler(event, context):
         print("No records to send.")
         return {'statusCode': 200, 'body': 'No records processed.'}
 
-    # Send messages in batches to SQS (max 10 messages per request)
+    # Send messages in batches to SQS (max 10 messages per request).
+    # Batches go out one after another so the FIFO group keeps stream order.
     try:
-        response = sqs.send_message_batch(
-            QueueUrl=SQS_QUEUE_URL,
-            Entries=entries
-        )
-        
-        if 'Failed' in response and response['Failed']:
-            print(f"Failed to send some messages: {response['Failed']}")
-            # Re-raise exception to retry the DDB stream batch
-            raise Exception("Failed to send all messages to SQS.")
+        for start in range(0, len(entries), SQS_BATCH_SIZE):
+            response = sqs.send_message_batch(
+                QueueUrl=SQS_QUEUE_URL,
+                Entries=entries[start:start + SQS_BATCH_SIZE]
+            )
+            
+            if 'Failed' in response and response['Failed']:
+                print(f"Failed to send some messages: {response['Failed']}")
+                # Re-raise exception to retry the DDB stream batch
+                raise Exception("Failed to send all messages to SQS.")
 
         print(f"Successfully routed {len(entries)} records to SQS.")
         return {'statusCode': 200, 'body': 'Messages routed successfully.'}
@@ -1,23 +1,26 @@
 # update_task.py - FIXED DATE PARSING
-import json
-import boto3
+import logging
 import os
 from datetime import datetime, timezone
-import re
+from _clients import dynamodb_client
+from _fastjson import dumps, loads
+from _utils import from_attribute_values, to_attribute_values
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
-dynamodb = boto3.resource('dynamodb')
 table_name = os.environ.get('TABLE_NAME', 'TodoAppTable')
-table = dynamodb.Table(table_name)
+_UTC = timezone.utc
+
+# CORS headers shared by every response
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
+    'Content-Type': 'application/json'
+}
 
 def handler(event, context):
-    # CORS headers
-    cors_headers = {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
-        'Content-Type': 'application/json'
-    }
-    
     try:
         # Extract user ID from Cognito authorizer
         user_id = event['requestContext']['authorizer']['claims']['sub']
@@ -26,11 +29,20 @@ def handler(event, context):
         task_id = event['pathParameters']['taskId']
         
         # Parse request body
-        body = json.loads(event['body'])
+        body = loads(event['body'])
         
         print(f"Updating task {task_id} for user {user_id}")
         print(f"Update data: {body}")
 
+        # All task attributes are stored as strings
+        for field in ('description', 'status', 'deadline'):
+            if field in body and not isinstance(body[field], str):
+                return {
+                    'statusCode': 400,
+                    'headers': _CORS_HEADERS,
+                    'body': dumps({'message': f'{field} must be a string'})
+                }
+
         # Build update expression
         update_parts = []
         expression_values = {}
@@ -51,22 +63,14 @@ def handler(event, context):
                 deadline_input = body['deadline']
                 print(f"Parsing deadline: {deadline_input}")
                 
-                # Handle different date formats
-                if deadline_input.endswith('Z'):
-                    # Handle Zulu time format: 2025-09-29T18:56:00.000Z
-                    deadline_dt = datetime.fromisoformat(deadline_input.replace('Z', '+00:00'))
-                elif '+' in deadline_input:
-                    # Handle timezone offset format: 2025-09-29T18:55:00+00:00
-                    deadline_dt = datetime.fromisoformat(deadline_input)
-                else:
-                    # Assume UTC if no timezone specified
-                    deadline_dt = datetime.fromisoformat(deadline_input).replace(tzinfo=timezone.utc)
+                # Python 3.11+ parses 'Z' and explicit offsets directly
+                deadline_dt = datetime.fromisoformat(deadline_input)
                 
-                # Ensure UTC timezone
+                # Ensure UTC timezone, assuming UTC if none was given
                 if deadline_dt.tzinfo is None:
-                    deadline_dt = deadline_dt.replace(tzinfo=timezone.utc)
+                    deadline_dt = deadline_dt.replace(tzinfo=_UTC)
                 else:
-                    deadline_dt = deadline_dt.astimezone(timezone.utc)
+                    deadline_dt = deadline_dt.astimezone(_UTC)
                 
                 # Format to ISO string with timezone
                 formatted_deadline = deadline_dt.isoformat()
@@ -81,27 +85,28 @@ def handler(event, context):
                 print(f"Invalid deadline format: {body['deadline']}, error: {e}")
                 return {
                     'statusCode': 400,
-                    'headers': cors_headers,
-                    'body': json.dumps({'message': f'Invalid deadline format: {str(e)}'})
+                    'headers': _CORS_HEADERS,
+                    'body': dumps({'message': f'Invalid deadline format: {str(e)}'})
                 }
         
         if not update_parts:
             return {
                 'statusCode': 400,
-                'headers': cors_headers,
-                'body': json.dumps({'message': 'No fields to update'})
+                'headers': _CORS_HEADERS,
+                'body': dumps({'message': 'No fields to update'})
             }
         
         update_expression = "SET " + ", ".join(update_parts)
         
         # Prepare update parameters
         update_params = {
+            'TableName': table_name,
             'Key': {
-                'PK': f"USER#{user_id}",
-                'SK': f"TASK#{task_id}"
+                'PK': {'S': f"USER#{user_id}"},
+                'SK': {'S': f"TASK#{task_id}"}
             },
             'UpdateExpression': update_expression,
-            'ExpressionAttributeValues': expression_values,
+            'ExpressionAttributeValues': to_attribute_values(expression_values),
             'ReturnValues': "ALL_NEW"
         }
         
@@ -111,25 +116,23 @@ def handler(event, context):
         
         # Perform the update
         print(f"Update params: {update_params}")
-        response = table.update_item(**update_params)
+        response = dynamodb_client.update_item(**update_params)
+        task = from_attribute_values(response['Attributes'])
         
-        print(f"Update successful: {response['Attributes']}")
+        print(f"Update successful: {task}")
         return {
             'statusCode': 200,
-            'headers': cors_headers,
-            'body': json.dumps(response['Attributes'])
+            'headers': _CORS_HEADERS,
+            'body': dumps(task)
         }
         
     except Exception as e:
-        print(f"Update error: {str(e)}")
-        import traceback
-        traceback_str = traceback.format_exc()
-        print(f"Traceback: {traceback_str}")
+        logger.exception("Update error: %s", e)
         
         return {
             'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({
+            'headers': _CORS_HEADERS,
+            'body': dumps({
                 'message': 'Failed to update task',
                 'error': str(e)
             })